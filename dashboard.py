@@ -2,17 +2,30 @@
 from __future__ import annotations
 
 import logging
+from html import escape
+from urllib.parse import urlencode
 
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
-from stock_data import DEFAULT_TICKERS, fetch_history, rank_top_performers
+from stock_data import (
+    DEFAULT_TICKERS,
+    DEFAULT_TICKERS_TEXT,
+    EmptyDataError,
+    load_cached,
+    rank_top_performers,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on points serialized to the browser for the price chart. Longer
+# series are downsampled with tsdownsample, which is optional and only imported
+# when a series actually exceeds it.
+_MAX_CHART_POINTS = 1000
+
 st.set_page_config(
     page_title="Top Stocks Scout",
     layout="wide",
@@ -22,7 +35,15 @@ st.set_page_config(
 # Custom CSS for better styling
 st.markdown("""
     <style>
+    .leaderboard {
+        display: grid;
+        grid-template-columns: repeat(3, 1fr);
+        gap: 0 1rem;
+    }
     .stock-card {
+        display: block;
+        color: inherit !important;
+        text-decoration: none !important;
         padding: 1rem;
         border-radius: 0.5rem;
         border: 2px solid #e0e0e0;
@@ -34,9 +55,10 @@ st.markdown("""
         border-color: #1f77b4;
         background-color: #f0f8ff;
     }
-    .stock-card.selected {
-        border-color: #1f77b4;
-        background-color: #e6f3ff;
+    .card-title {
+        font-size: 1.5em;
+        font-weight: 600;
+        margin: 0;
     }
     .positive {
         color: #00cc00;
@@ -52,6 +74,21 @@ st.markdown("""
 st.title("📈 Top Stock Performers")
 st.markdown("**Discover the best performing stocks right now. Click any stock to see its growth chart.**")
 
+def _query_int(name: str, default: int, min_value: int, max_value: int) -> int:
+    """Read an integer setting from the URL, falling back to the default if absent or invalid."""
+    try:
+        value = int(st.query_params.get(name, default))
+    except ValueError:
+        return default
+    return min(max(value, min_value), max_value)
+
+
+@st.cache_data(show_spinner=False)
+def _parse_tickers(raw: str) -> tuple[str, ...]:
+    """Split the comma-separated text area into normalized ticker symbols."""
+    return tuple(t.strip().upper() for t in raw.split(",") if t.strip())
+
+
 # Sidebar configuration
 with st.sidebar:
     st.header("⚙️ Settings")
@@ -60,7 +97,7 @@ with st.sidebar:
         "Lookback Period (days)",
         min_value=7,
         max_value=90,
-        value=30,
+        value=_query_int("days", 30, 7, 90),
         help="How many days to look back for performance calculation"
     )
     
@@ -68,7 +105,7 @@ with st.sidebar:
         "Number of Top Stocks",
         min_value=5,
         max_value=20,
-        value=10,
+        value=_query_int("top", 10, 5, 20),
         help="How many top performers to display"
     )
     
@@ -76,39 +113,59 @@ with st.sidebar:
     st.markdown("### 📊 Stock Universe")
     selected = st.text_area(
         "Tickers (comma-separated)",
-        ", ".join(DEFAULT_TICKERS),
+        st.query_params.get("tickers", DEFAULT_TICKERS_TEXT),
         help="Enter stock ticker symbols separated by commas",
         height=150
     )
     
-    tickers = [t.strip().upper() for t in selected.split(",") if t.strip()]
+    tickers = _parse_tickers(selected)
     
     if not tickers:
         st.warning("⚠️ Please enter at least one ticker symbol.")
         st.stop()
     
+    # Mirror the settings into the URL so the leaderboard links keep them across page loads
+    st.query_params["days"] = str(days)
+    st.query_params["top"] = str(top_n)
+    if tickers != DEFAULT_TICKERS:
+        st.query_params["tickers"] = ", ".join(tickers)
+    else:
+        st.query_params.pop("tickers", None)
+    
     st.markdown("---")
     st.caption(f"📅 Data updates automatically from Yahoo Finance")
 
-# Cache data fetching
+# Cache data fetching: the parquet store persists across restarts, this caches the sliced frame
 @st.cache_data(ttl=3600, show_spinner=True)  # Cache for 1 hour
-def _load_data(tickers: list[str], days: int) -> pd.DataFrame:
+def _load_data(tickers: tuple[str, ...], days: int) -> pd.DataFrame:
     """Load stock data with caching."""
-    return fetch_history(tickers, days)
+    return load_cached(tickers, days)
+
+@st.cache_data(ttl=60, show_spinner=False)  # Remember empty results briefly so reruns don't hit Yahoo
+def _empty_data_reason(tickers: tuple[str, ...], days: int) -> str | None:
+    """Return why no data is available for the tickers, or None if it loads."""
+    try:
+        _load_data(tickers, days)
+    except EmptyDataError as exc:
+        return str(exc)
+    return None
 
 # Load and process data
 try:
     with st.spinner("🔄 Fetching latest stock data..."):
-        prices = _load_data(tickers, days)
-        summary = rank_top_performers(tickers, days, top_n)
-    
-    # Handle MultiIndex columns if present (yfinance sometimes returns MultiIndex)
-    if isinstance(prices.columns, pd.MultiIndex):
-        # Flatten MultiIndex columns - take the last level (ticker name)
-        prices.columns = [col[-1] if isinstance(col, tuple) else col for col in prices.columns]
+        # Key the caches on the ticker set so reordering or repeating symbols still hits
+        universe = tuple(sorted(set(tickers)))
+        empty_reason = _empty_data_reason(universe, days)
+        if empty_reason is not None:
+            st.warning(f"⚠️ {empty_reason}")
+            st.stop()
+        prices = _load_data(universe, days)
+        # Restore the order the user typed the tickers in
+        prices = prices.reindex(columns=[t for t in dict.fromkeys(tickers) if t in prices.columns])
+        summary = rank_top_performers(tickers, days, top_n, closes=prices)
     
     retrieved_count = len(prices.columns)
-    requested_count = len(tickers)
+    requested_count = len(universe)
     
     if retrieved_count < requested_count:
         st.warning(
@@ -126,96 +183,80 @@ except Exception as exc:
     logger.exception("Error loading stock data")
     st.stop()
 
-# Initialize session state for selected stock
-if "selected_ticker" not in st.session_state:
+# The selected stock is driven by the ?ticker= query parameter, so leaderboard cards are plain links
+available_tickers = summary["ticker"].tolist()
+selected_ticker = st.query_params.get("ticker")
+if selected_ticker not in available_tickers:
     # Default to top performer
-    if not summary.empty:
-        st.session_state.selected_ticker = summary.iloc[0]["ticker"]
-    else:
-        st.session_state.selected_ticker = None
+    selected_ticker = available_tickers[0]
 
-# Display top performers in a grid
-st.subheader("🏆 Top Performers Leaderboard")
 
-# Create columns for stock cards
-num_cols = 3
-cols = st.columns(num_cols)
+@st.cache_data(show_spinner=False)
+def _render_leaderboard_html(
+    rows: tuple[tuple[str, float, float, float], ...],
+    link_params: tuple[tuple[str, str], ...]
+) -> str:
+    """Build the leaderboard cards as one HTML string of links that select their ticker.
 
-for idx, row in summary.iterrows():
-    col_idx = idx % num_cols
-    ticker = row["ticker"]
-    pct_change = row["pct_change"]
-    start_price = row["start_price"]
-    end_price = row["end_price"]
-    
-    with cols[col_idx]:
-        # Determine if this card is selected
-        is_selected = st.session_state.selected_ticker == ticker
-        
-        # Color based on performance
+    The result does not depend on the selected ticker, so it stays cached while
+    the user clicks through the chart; the highlight is applied with CSS.
+    """
+    cards = []
+    for ticker, start_price, end_price, pct_change in rows:
         color_class = "positive" if pct_change >= 0 else "negative"
         symbol = "📈" if pct_change >= 0 else "📉"
-        
-        # Create clickable card
-        card_style = "selected" if is_selected else ""
-        
-        # Display stock info in a card-like format
-        st.markdown(f"### {symbol} {ticker}")
-        st.markdown(f"<p class='{color_class}' style='font-size: 1.5em; margin: 0.5em 0;'>{pct_change:+.2f}%</p>", unsafe_allow_html=True)
-        st.markdown(f"<p style='font-size: 0.9em; color: #666;'>${start_price:.2f} → ${end_price:.2f}</p>", unsafe_allow_html=True)
-        
-        # Button to select this stock
-        if st.button(f"📊 View Chart", key=f"btn_{ticker}", use_container_width=True):
-            st.session_state.selected_ticker = ticker
-            st.rerun()
+        href = "?" + urlencode(link_params + (("ticker", ticker),))
+        cards.append(
+            f"<a class='stock-card' data-ticker='{escape(ticker)}' href='{escape(href)}' target='_self'>"
+            f"<p class='card-title'>{symbol} {escape(ticker)}</p>"
+            f"<p class='{color_class}' style='font-size: 1.5em; margin: 0.5em 0;'>{pct_change:+.2f}%</p>"
+            f"<p style='font-size: 0.9em; color: #666; margin: 0;'>${start_price:.2f} → ${end_price:.2f}</p>"
+            "</a>"
+        )
+    return f"<div class='leaderboard'>{''.join(cards)}</div>"
+
+
+# Display top performers in a grid, rendered as a single markdown element
+st.subheader("🏆 Top Performers Leaderboard")
+
+leaderboard_html = _render_leaderboard_html(
+    tuple(summary.itertuples(index=False, name=None)),
+    tuple((k, v) for k, v in st.query_params.to_dict().items() if k != "ticker")
+)
+st.markdown(
+    f"<style>.stock-card[data-ticker='{escape(selected_ticker)}'] "
+    "{ border-color: #1f77b4; background-color: #e6f3ff; }</style>",
+    unsafe_allow_html=True
+)
+st.markdown(leaderboard_html, unsafe_allow_html=True)
 
 # Main chart area
 st.markdown("---")
 st.subheader("📊 Stock Performance Chart")
 
-# Stock selector
-available_tickers = summary["ticker"].tolist()
-try:
-    default_index = available_tickers.index(st.session_state.selected_ticker) if st.session_state.selected_ticker in available_tickers else 0
-except (ValueError, AttributeError):
-    default_index = 0
+# Stock selector, kept as an alternative to clicking a card
+def _on_ticker_selected() -> None:
+    """Keep the URL in sync when the selection changes through the selectbox."""
+    st.query_params["ticker"] = st.session_state.ticker_selector
+
 
 selected_ticker = st.selectbox(
     "Select a stock to view its chart:",
     options=available_tickers,
-    index=default_index,
-    key="ticker_selector"
+    index=available_tickers.index(selected_ticker),
+    key="ticker_selector",
+    on_change=_on_ticker_selected
 )
 
-# Update session state
-st.session_state.selected_ticker = selected_ticker
-
 if selected_ticker:
-    # Ensure selected_ticker is a string (not a tuple)
-    if isinstance(selected_ticker, tuple):
-        selected_ticker = selected_ticker[-1]  # Take last element if tuple
-    selected_ticker = str(selected_ticker)
-    
-    # Check if columns are MultiIndex and flatten them if needed
-    if isinstance(prices.columns, pd.MultiIndex):
-        # Flatten MultiIndex columns - take the last level (ticker name)
-        prices.columns = [col[-1] if isinstance(col, tuple) else str(col) for col in prices.columns]
-    else:
-        # Ensure all columns are strings
-        prices.columns = [str(col) for col in prices.columns]
-    
     # Check if ticker exists in columns
     if selected_ticker not in prices.columns:
         st.error(f"Ticker {selected_ticker} not found in data. Available columns: {list(prices.columns)[:10]}")
         st.stop()
     
     # Prepare data for the selected stock
-    # Get the price series directly first
-    price_series = prices[selected_ticker].copy()
-    
-    # Reset index to convert date index to a column
-    stock_data = prices[[selected_ticker]].copy()
-    stock_data = stock_data.reset_index()
+    # Reset index to convert date index to a column (reset_index already returns a new frame)
+    stock_data = prices[[selected_ticker]].reset_index()
     
     # Find the date column - after reset_index, the index becomes a column
     # Check for common date column names
@@ -256,7 +297,7 @@ if selected_ticker:
             st.markdown("**Ticker**")
             st.markdown(f"### {selected_ticker}")
         with col2:
-            st.metric("Current Price", current_price, delta=None)
+            st.metric("Current Price", f"${current_price:.2f}", delta=None)
         with col3:
             st.metric("30-Day Change", f"{pct_change:+.2f}%")
         with col4:
@@ -270,37 +311,39 @@ if selected_ticker:
                 start_val = float(price_list[0])
                 end_val = float(price_list[-1])
             price_change = end_val - start_val
-            st.metric("Price Change", price_change, delta=None)
+            st.metric("Price Change", f"{price_change:+.2f}", delta=None)
     
     # Create the chart
     try:
+        # Downsample long series so the JSON payload stays bounded regardless of lookback
+        chart_dates = stock_data["Date"]
+        chart_prices = price_series
+        if len(price_series) > _MAX_CHART_POINTS:
+            try:
+                from tsdownsample import MinMaxLTTBDownsampler
+            except ImportError:
+                logger.warning("tsdownsample is not installed; plotting all %d points", len(price_series))
+            else:
+                keep = MinMaxLTTBDownsampler().downsample(price_series.to_numpy(), n_out=_MAX_CHART_POINTS)
+                chart_dates = chart_dates.iloc[keep]
+                chart_prices = price_series.iloc[keep]
+        
         fig = go.Figure()
         
-        fig.add_trace(go.Scatter(
-            x=stock_data["Date"],
-            y=price_series,
+        fig.add_trace(go.Scattergl(
+            x=chart_dates,
+            y=chart_prices,
             mode='lines+markers',
             name=selected_ticker,
             line=dict(color='#1f77b4', width=3),
             marker=dict(size=6),
+            fill='tozeroy',
+            fillcolor='rgba(31, 119, 180, 0.1)',
             hovertemplate='<b>%{fullData.name}</b><br>' +
                          'Date: %{x}<br>' +
                          'Price: $%{y:.2f}<extra></extra>'
         ))
         
-        # Add fill area
-        fig.add_trace(go.Scatter(
-            x=stock_data["Date"],
-            y=price_series,
-            mode='lines',
-            name='Fill',
-            fill='tozeroy',
-            fillcolor='rgba(31, 119, 180, 0.1)',
-            line=dict(width=0),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
-        
         # Calculate trend - extract scalar values
         try:
             start_price = float(price_series.iloc[0])
@@ -336,17 +379,20 @@ if selected_ticker:
         with st.expander("📈 Detailed Statistics", expanded=False):
             col1, col2, col3 = st.columns(3)
             
+            # Reduce over the raw array once rather than through four pandas reductions
+            prices_arr = price_series.to_numpy()
+            highest = float(prices_arr.max())
+            lowest = float(prices_arr.min())
+            avg_price = float(prices_arr.mean())
+            volatility = float(prices_arr.std(ddof=1))  # sample std, as pandas computed it
+            
             with col1:
-                highest = float(price_series.max())
-                st.metric("Highest Price", highest, delta=None)
-                lowest = float(price_series.min())
-                st.metric("Lowest Price", lowest, delta=None)
+                st.metric("Highest Price", f"${highest:.2f}", delta=None)
+                st.metric("Lowest Price", f"${lowest:.2f}", delta=None)
             
             with col2:
-                avg_price = float(price_series.mean())
-                st.metric("Average Price", avg_price, delta=None)
-                volatility = float(price_series.std())
-                st.metric("Volatility", volatility, delta=None)
+                st.metric("Average Price", f"${avg_price:.2f}", delta=None)
+                st.metric("Volatility", f"{volatility:.2f}", delta=None)
             
             with col3:
                 total_return = float(((end_price - start_price) / start_price) * 100)
@@ -366,7 +412,7 @@ else:
 st.markdown("---")
 st.markdown("""
     <div style='text-align: center; color: #666; padding: 1rem;'>
-        <p>📊 Data provided by Yahoo Finance via yfinance</p>
+        <p>📊 Data provided by Yahoo Finance</p>
         <p>💡 Tip: Refresh the page to get the latest data</p>
     </div>
 """, unsafe_allow_html=True)
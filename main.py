@@ -6,6 +6,7 @@ import logging
 import sys
 from typing import Iterable
 
+import numpy as np
 from tabulate import tabulate
 
 from notifier import format_summary, send_notification
@@ -28,11 +29,19 @@ def display_table(tickers: Iterable[str], days: int, top_n: int) -> str:
     """
     message, summary = format_summary(tickers, days, top_n)
     headers = ["Rank", "Ticker", "Start", "End", "% Change"]
-    rows = [
-        (idx + 1, row.ticker, row.start_price, row.end_price, f"{row.pct_change}%")
-        for idx, row in enumerate(summary.itertuples())
-    ]
-    print(tabulate(rows, headers=headers, tablefmt="github"))
+    # Build each column as an array and zip them once. floatfmt does not reach the
+    # string % column, so format it to two decimals here to match the notifier.
+    pct_labels = np.char.mod("%.2f%%", summary["pct_change"].to_numpy())
+    rows = list(
+        zip(
+            range(1, len(summary) + 1),
+            summary["ticker"].to_numpy(),
+            summary["start_price"].to_numpy(),
+            summary["end_price"].to_numpy(),
+            pct_labels,
+        )
+    )
+    print(tabulate(rows, headers=headers, tablefmt="github", floatfmt=".2f"))
     return message
 
 
@@ -67,7 +76,7 @@ def main() -> None:
         if args.notify:
             send_notification("Top movers update", message)
     except Exception as e:
-        logger.error(f"Error: {e}")
+        logger.error("Error: %s", e)
         sys.exit(1)
 
 
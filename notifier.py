@@ -26,8 +26,8 @@ def format_summary(tickers: Iterable[str], days: int, top_n: int) -> tuple[str,
         Tuple of (formatted message string, summary DataFrame)
     """
     closes = fetch_history(tickers, days)
-    summary = rank_top_performers(tickers, days, top_n)
-    lines = [f"{row.ticker}: {row.pct_change}%" for row in summary.itertuples()]
+    summary = rank_top_performers(tickers, days, top_n, closes=closes)
+    lines = [f"{row.ticker}: {row.pct_change:.2f}%" for row in summary.itertuples(index=False)]
     return "\n".join(lines), summary
 
 
@@ -45,7 +45,7 @@ def send_notification(title: str, message: str) -> None:
         notification.notify(title=title, message=message, timeout=10)
         logger.info("Notification sent successfully")
     except Exception as e:
-        logger.error(f"Failed to send notification: {e}")
+        logger.error("Failed to send notification: %s", e)
         raise
 
 
@@ -69,7 +69,7 @@ def main() -> None:
         message, _ = format_summary(args.tickers, args.days, args.top)
         send_notification("Top movers update", message)
     except Exception as e:
-        logger.error(f"Failed to send notification: {e}")
+        logger.error("Failed to send notification: %s", e)
         raise
 
 
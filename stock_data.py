@@ -1,18 +1,43 @@
 """Utilities to fetch and rank stocks by recent performance."""
 from __future__ import annotations
 
+import functools
+import hashlib
 import logging
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Iterable
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
+import requests
+import requests_cache
+from requests.adapters import HTTPAdapter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Slices of the price frame are shared rather than copied (always on from pandas 3.0)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.options.mode.copy_on_write = True
 
-DEFAULT_TICKERS: list[str] = [
+_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+_REQUEST_TIMEOUT = 10
+_MAX_WORKERS = 16
+
+# Root of the on-disk caches: per-ticker parquet files for load_cached and whole
+# fetch_history results under "history". Each per-ticker file records the window
+# start it was fetched from, and is only extended in place when that start
+# reaches back to the requested window (the first bar itself rarely lands on the
+# window start because of weekends and holidays).
+CACHE_DIR = Path("~/.cache/stocks").expanduser()
+
+
+DEFAULT_TICKERS: tuple[str, ...] = (
     # A compact, high-liquidity universe across sectors
     "AAPL",
     "MSFT",
@@ -64,140 +89,515 @@ DEFAULT_TICKERS: list[str] = [
     "BMY",
     "MS",
     "GS",
-]
+)
 
+# Comma-separated form of DEFAULT_TICKERS, as shown in the dashboard's text area
+DEFAULT_TICKERS_TEXT = ", ".join(DEFAULT_TICKERS)
 
-def fetch_history(tickers: Iterable[str], days: int = 30) -> pd.DataFrame:
-    """Return recent adjusted close prices for the provided tickers.
 
-    The function requests a little more data than the requested window to avoid
-    empty results when markets are closed. The output is a DataFrame indexed by
-    date with tickers as columns and contains adjusted close values.
+class EmptyDataError(ValueError):
+    """Raised when Yahoo returns no usable price data for the requested tickers."""
+
+
+@functools.lru_cache(maxsize=1)
+def _get_session() -> requests.Session:
+    """Return the shared HTTP session, creating it on first use.
+
+    One session serves every request: it keeps connections alive between
+    tickers and serves repeat requests for the same day-aligned window (see
+    _day_bounds) within the hour from a SQLite cache kept next to the parquet
+    files, not in whichever directory the app was started from. The pool holds
+    one connection per worker so concurrent fetches reuse TLS connections
+    instead of discarding them past requests' default of 10.
+
+    It is built lazily so importing this module touches no files, and expired
+    responses are purged once when it is created. If the cache directory cannot
+    be created, a plain uncached session is used instead.
+    """
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        session = requests_cache.CachedSession(
+            str(CACHE_DIR / "http_cache"), backend="sqlite", expire_after=3600
+        )
+        # Chart URLs change daily, so stale rows are never requested again;
+        # requests_cache only removes them when asked to
+        session.cache.delete(expired=True)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("HTTP cache unavailable, fetching without it: %s", e)
+        session = requests.Session()
+    session.headers["User-Agent"] = "Mozilla/5.0"
+    session.mount("https://", HTTPAdapter(pool_maxsize=_MAX_WORKERS))
+    return session
+
+
+def _fetch_one(session: requests.Session, ticker: str, period1: int, period2: int) -> pd.Series | None:
+    """Fetch daily adjusted closes for a single ticker from Yahoo's chart API.
+
+    Args:
+        session: HTTP session to issue the request on
+        ticker: Stock ticker symbol
+        period1: Window start as a Unix timestamp (seconds)
+        period2: Window end as a Unix timestamp (seconds)
+
+    Returns:
+        Series of adjusted closes indexed by date, or None if the request failed
+    """
+    try:
+        response = session.get(
+            _CHART_URL.format(ticker=ticker),
+            params={"period1": period1, "period2": period2, "interval": "1d"},
+            timeout=_REQUEST_TIMEOUT,
+        )
+        response.raise_for_status()
+        result = response.json()["chart"]["result"][0]
+        timestamps = result["timestamp"]
+        adjclose = result["indicators"]["adjclose"][0]["adjclose"]
+    except (requests.RequestException, ValueError, KeyError, IndexError, TypeError) as e:
+        logger.warning("Failed to fetch data for %s: %s", ticker, e)
+        return None
+
+    index = pd.to_datetime(timestamps, unit="s").normalize()
+    s = pd.Series(adjclose, index=index, dtype="float64", name=ticker)
+    # The live bar can arrive as a separate row on the same date as the last
+    # daily bar; keep only the most recent price for each date
+    return s[~s.index.duplicated(keep="last")]
+
+
+def _day_bounds(start_date: datetime, end_date: datetime) -> tuple[int, int]:
+    """Snap a window to UTC midnights as (period1, period2) Unix timestamps.
+
+    Second-precision bounds would give every request a distinct chart URL, so
+    the HTTP cache could never serve a hit. Widening the window to whole UTC days
+    (through the next midnight, so today's bar is included) keeps the URL for a
+    given window identical all day.
+    """
+    day = 86400
+    period1 = int(start_date.timestamp()) // day * day
+    period2 = (int(end_date.timestamp()) // day + 1) * day
+    return period1, period2
+
+
+def _normalize_tickers(tickers: Iterable[str]) -> list[str]:
+    """Validate and normalize ticker symbols.
 
     Args:
         tickers: Iterable of stock ticker symbols
-        days: Number of days of history to retrieve (default: 30)
 
     Returns:
-        DataFrame with dates as index and tickers as columns, containing adjusted close prices
+        List of stripped, upper-cased ticker symbols
 
     Raises:
-        ValueError: If no valid tickers are provided or if days is invalid
-        Exception: If data fetching fails
+        ValueError: If no valid tickers are provided
     """
     ticker_list = list(tickers)
     if not ticker_list:
         raise ValueError("At least one ticker must be provided")
-    if days <= 0:
-        raise ValueError("Days must be a positive integer")
 
-    # Validate and normalize ticker symbols
-    ticker_list = [t.strip().upper() for t in ticker_list if t.strip()]
+    stripped = [t.strip() for t in ticker_list]
+    ticker_list = [t.upper() for t in stripped if t]
     if not ticker_list:
         raise ValueError("No valid ticker symbols provided")
+    return ticker_list
 
-    logger.info(f"Fetching data for {len(ticker_list)} tickers over {days} days")
 
-    end_date = datetime.now(timezone.utc)
-    start_date = end_date - timedelta(days=days + 5)
-    
-    try:
-        data = yf.download(
-            ticker_list,
-            start=start_date.strftime("%Y-%m-%d"),
-            end=end_date.strftime("%Y-%m-%d"),
-            progress=False,
-            group_by="column",
-            auto_adjust=True,
-        )
-    except Exception as e:
-        logger.error(f"Failed to download data from yfinance: {e}")
-        raise RuntimeError(f"Failed to fetch stock data: {e}") from e
+def _fetch_many(periods: dict[str, tuple[int, int]]) -> dict[str, pd.Series]:
+    """Fetch several tickers concurrently, each over its own window.
+
+    Args:
+        periods: Mapping of ticker symbol to its (period1, period2) Unix timestamps
+
+    Returns:
+        Mapping of ticker symbol to its adjusted closes, omitting failed tickers
+    """
+    # Create the session before fanning out so the workers all share one
+    session = _get_session()
+    # Never start more threads than there are tickers to fetch
+    with ThreadPoolExecutor(max_workers=max(1, min(_MAX_WORKERS, len(periods)))) as executor:
+        fetched = executor.map(lambda t: _fetch_one(session, t, *periods[t]), periods)
+        return {ticker: s for ticker, s in zip(periods, fetched) if s is not None}
 
-    # When only one ticker is present, yfinance returns a Series
-    if isinstance(data, pd.DataFrame) and ("Adj Close" in data.columns):
-        closes = data["Adj Close"]
-    else:  # Single ticker case
-        closes = data
 
+def _assemble(series: dict[str, pd.Series], ticker_list: list[str], days: int) -> pd.DataFrame:
+    """Combine per-ticker closes into the wide frame returned to callers.
+
+    Args:
+        series: Mapping of ticker symbol to its adjusted closes
+        ticker_list: Tickers that were requested, used to report missing ones
+        days: Number of most recent rows to keep
+
+    Returns:
+        DataFrame with dates as index and tickers as columns, as float32
+
+    Raises:
+        EmptyDataError: If no price data is available
+    """
+    if not series:
+        raise EmptyDataError("No price data returned; check tickers or network connectivity.")
+
+    # Concatenating Series keyed by ticker yields flat, string ticker columns
+    closes = pd.concat(series.values(), axis=1, keys=list(series.keys()))
+
+    # Drop all-NaN tickers, then any date still missing a price, working from a
+    # single NaN mask. Prices only carry a few significant digits, so the array
+    # is float32, halving memory for every downstream op.
+    arr = closes.to_numpy(dtype=np.float32)
+    missing = np.isnan(arr)
+    keep_cols = ~missing.all(axis=0)
+    if not keep_cols.all():
+        arr = arr[:, keep_cols]
+        missing = missing[:, keep_cols]
+    if not arr.flags.writeable:
+        # pandas may hand back a read-only array, e.g. for a single float64
+        # column cast to float32, and the gap fill below writes in place
+        arr = arr.copy()
+
+    # Carry the previous close into isolated one-day gaps (ffill(limit=1)) so a
+    # single ticker missing a day does not drop that date for every ticker
+    fill = missing[1:] & ~missing[:-1]
+    arr[1:][fill] = arr[:-1][fill]
+    missing[1:][fill] = False
+
+    keep_rows = ~missing.any(axis=1)
+    closes = pd.DataFrame(
+        arr[keep_rows],
+        index=closes.index[keep_rows],
+        columns=closes.columns[keep_cols],
+    )
     if closes.empty:
-        raise ValueError("No price data returned; check tickers or network connectivity.")
+        raise EmptyDataError("No overlapping price data returned for the requested tickers.")
 
-    closes = closes.dropna(axis=1, how="all").dropna()
-    
-    # Handle MultiIndex columns - flatten them to simple column names
-    if isinstance(closes.columns, pd.MultiIndex):
-        # Flatten MultiIndex columns - take the last level (ticker name)
-        closes.columns = [col[-1] if isinstance(col, tuple) else str(col) for col in closes.columns]
-    else:
-        # Ensure all columns are strings
-        closes.columns = [str(col) for col in closes.columns]
-    
     # Log which tickers were successfully retrieved
     retrieved_tickers = list(closes.columns)
     if len(retrieved_tickers) < len(ticker_list):
-        missing = set(ticker_list) - set(retrieved_tickers)
-        logger.warning(f"Failed to retrieve data for tickers: {missing}")
-    
+        missing_tickers = set(ticker_list) - set(retrieved_tickers)
+        logger.warning("Failed to retrieve data for tickers: %s", missing_tickers)
+
     closes.index.name = "Date"
     result = closes.tail(days)
-    logger.info(f"Successfully retrieved data for {len(result.columns)} tickers")
+    logger.info("Successfully retrieved data for %d tickers", len(result.columns))
+    return result
+
+
+def _read_parquet(path: Path) -> pd.DataFrame | None:
+    """Read a cached frame, or None if it is missing or unreadable."""
+    if not path.exists():
+        return None
+    try:
+        return pd.read_parquet(path)
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable cache file %s: %s", path, e)
+        return None
+
+
+def _write_parquet(path: Path, frame: pd.DataFrame) -> None:
+    """Atomically replace a cached frame.
+
+    The frame is written to a uniquely named file in the same directory first,
+    so concurrent writers of the same path never share a temporary file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".parquet.tmp", delete=False) as tmp:
+        tmp_path = Path(tmp.name)
+    try:
+        frame.to_parquet(tmp_path, engine="pyarrow")
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _prune_expired(directory: Path, max_age: float) -> None:
+    """Delete cached parquet files in ``directory`` older than ``max_age`` seconds."""
+    cutoff = time.time() - max_age
+    for path in directory.glob("*.parquet"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            # Another process may have replaced or removed it already
+            pass
+
+
+def fetch_history(tickers: Iterable[str], days: int = 30, cache_ttl: float = 3600) -> pd.DataFrame:
+    """Return recent adjusted close prices for the provided tickers.
+
+    The function requests a little more data than the requested window to avoid
+    empty results when markets are closed. Each ticker is fetched concurrently
+    from Yahoo's chart API over a shared cached HTTP session, so the wall clock
+    is bounded by the slowest request rather than the sum of all of them. The
+    output is a DataFrame indexed by date with tickers as columns and contains
+    adjusted close values.
+
+    Results are also persisted under ``CACHE_DIR / "history"``, keyed by the
+    ticker set and date range, so a repeated call within ``cache_ttl`` seconds
+    skips the network entirely. Only results that include every requested
+    ticker are persisted, and entries older than ``cache_ttl`` are deleted
+    whenever a new one is written.
+
+    Args:
+        tickers: Iterable of stock ticker symbols
+        days: Number of days of history to retrieve (default: 30)
+        cache_ttl: Seconds a persisted result stays valid; 0 disables it (default: 3600)
+
+    Returns:
+        DataFrame with dates as index and tickers as columns, containing adjusted close prices
+
+    Raises:
+        ValueError: If no valid tickers are provided or if days is invalid
+        EmptyDataError: If no price data could be retrieved
+    """
+    ticker_list = _normalize_tickers(tickers)
+    if days <= 0:
+        raise ValueError("Days must be a positive integer")
+
+    end_date = datetime.now(timezone.utc)
+    start_date = end_date - timedelta(days=days + 5)
+
+    cache_key = hashlib.sha1(
+        repr((tuple(sorted(set(ticker_list))), start_date.date(), end_date.date())).encode()
+    ).hexdigest()
+    cache_path = CACHE_DIR / "history" / f"{cache_key}.parquet"
+    if cache_ttl > 0 and cache_path.exists() and time.time() - cache_path.stat().st_mtime < cache_ttl:
+        cached = _read_parquet(cache_path)
+        if cached is not None:
+            logger.info("Loaded %d tickers from %s", len(cached.columns), cache_path)
+            # The key ignores order, so return the columns in the order requested
+            return cached.reindex(columns=[t for t in dict.fromkeys(ticker_list) if t in cached.columns])
+
+    logger.info("Fetching data for %d tickers over %d days", len(ticker_list), days)
+
+    window = _day_bounds(start_date, end_date)
+    series = _fetch_many({ticker: window for ticker in ticker_list})
+    result = _assemble(series, ticker_list, days)
+    # Only persist complete results, so a transient failure (e.g. a 429) is
+    # retried and reported on the next call instead of cached for cache_ttl
+    if cache_ttl > 0 and set(result.columns) >= set(ticker_list):
+        # The cache is best-effort: a failed write must not discard a good fetch
+        try:
+            _write_parquet(cache_path, result)
+        except OSError as e:
+            logger.warning("Could not persist %s: %s", cache_path, e)
+        # Keys include the dates, so entries are never overwritten; expired ones
+        # can no longer be served and are dropped to keep the directory bounded
+        _prune_expired(cache_path.parent, cache_ttl)
     return result
 
 
+def load_cached(tickers: Iterable[str], days: int = 30, cache_dir: Path = CACHE_DIR) -> pd.DataFrame:
+    """Return recent adjusted close prices, extending an on-disk cache incrementally.
+
+    Each ticker's daily history is stored in ``{cache_dir}/{ticker}.parquet``.
+    For tickers already on disk only the bars from the last stored date onwards
+    are requested (the last bar is re-fetched because it may have been stored
+    intraday); tickers with no stored history, or whose stored window does not
+    reach back to the start of the requested one, are fetched in full. Each file
+    records that window start in its ``covered_from`` attribute. The result has
+    the same shape as ``fetch_history``.
+
+    Args:
+        tickers: Iterable of stock ticker symbols
+        days: Number of days of history to retrieve (default: 30)
+        cache_dir: Directory holding the per-ticker parquet files (default: CACHE_DIR)
+
+    Returns:
+        DataFrame with dates as index and tickers as columns, containing adjusted close prices
+
+    Raises:
+        ValueError: If no valid tickers are provided or if days is invalid
+        EmptyDataError: If no price data could be retrieved
+    """
+    ticker_list = _normalize_tickers(tickers)
+    if days <= 0:
+        raise ValueError("Days must be a positive integer")
+
+    end_date = datetime.now(timezone.utc)
+    start_date = end_date - timedelta(days=days + 5)
+    window_start = pd.Timestamp(start_date.date())
+    # Epoch bounds are computed once; incremental tickers only swap in their own start,
+    # which is a stored (midnight) date and so keeps their URLs stable too
+    full_window = _day_bounds(start_date, end_date)
+    period2 = full_window[1]
+
+    stored: dict[str, pd.Series] = {}
+    covered: dict[str, pd.Timestamp] = {}
+    periods: dict[str, tuple[int, int]] = {}
+    for ticker in ticker_list:
+        periods[ticker] = full_window
+        stored_frame = _read_parquet(cache_dir / f"{ticker}.parquet")
+        if stored_frame is None or stored_frame.empty:
+            continue
+        history = stored_frame.iloc[:, 0]
+        # Files without a recorded window start only cover the window if their
+        # first bar does
+        covered_from = pd.Timestamp(stored_frame.attrs.get("covered_from", history.index[0]))
+        if covered_from <= window_start:
+            stored[ticker] = history
+            covered[ticker] = covered_from
+            periods[ticker] = (int(history.index[-1].timestamp()), period2)
+
+    logger.info(
+        "Fetching data for %d tickers over %d days (%d extended from cache)",
+        len(periods),
+        days,
+        len(stored),
+    )
+
+    for ticker, fresh in _fetch_many(periods).items():
+        history = stored.get(ticker)
+        if history is not None:
+            history = pd.concat([history, fresh])
+            history = history[~history.index.duplicated(keep="last")].sort_index()
+        else:
+            history = fresh
+        stored[ticker] = history
+        frame = history.to_frame()
+        frame.attrs["covered_from"] = covered.get(ticker, window_start).isoformat()
+        # The cache is best-effort: a failed write must not discard a good fetch
+        try:
+            _write_parquet(cache_dir / f"{ticker}.parquet", frame)
+        except OSError as e:
+            logger.warning("Could not update cache for %s: %s", ticker, e)
+
+    series = {
+        ticker: stored[ticker][stored[ticker].index >= window_start]
+        for ticker in ticker_list
+        if ticker in stored
+    }
+    return _assemble(series, ticker_list, days)
+
+
 def rank_top_performers(
-    tickers: Iterable[str] = DEFAULT_TICKERS, days: int = 30, top_n: int = 10
+    tickers: Iterable[str] = DEFAULT_TICKERS,
+    days: int = 30,
+    top_n: int = 10,
+    *,
+    closes: pd.DataFrame | None = None,
 ) -> pd.DataFrame:
     """Compute top performing tickers by percentage change over the window.
 
+    Results computed from ``tickers`` (not from ``closes``) are memoized within
+    the process for the current wall-clock minute, so repeated requests for the
+    same universe reuse the ranking; each call receives its own copy.
+
     Args:
         tickers: Iterable of stock ticker symbols to analyze (default: DEFAULT_TICKERS)
         days: Number of days to look back (default: 30)
         top_n: Number of top performers to return (default: 10)
+        closes: Already-fetched price history to rank instead of calling
+            ``fetch_history(tickers, days)`` (default: None)
 
     Returns:
         DataFrame with columns: ticker, start_price, end_price, pct_change
-        Sorted by pct_change in descending order, limited to top_n rows
+        Sorted by pct_change in descending order, limited to top_n rows.
+        Prices are the stored float32 closes as float64, and pct_change is
+        recomputed from them in float64. Values are not rounded; format them
+        for display.
 
     Raises:
-        ValueError: If no data is available or if top_n is invalid
+        ValueError: If top_n is invalid
+        EmptyDataError: If no data is available
     """
     if top_n <= 0:
         raise ValueError("top_n must be a positive integer")
 
-    closes = fetch_history(tickers, days)
+    if closes is not None:
+        return _rank_closes(closes, top_n)
+    minute_bucket = int(time.time() // 60)
+    return _ranked(tuple(_normalize_tickers(tickers)), days, top_n, minute_bucket).copy()
+
+
+@functools.lru_cache(maxsize=32)
+def _ranked(ticker_tuple: tuple[str, ...], days: int, top_n: int, minute_bucket: int) -> pd.DataFrame:
+    """Fetch and rank a universe; ``minute_bucket`` only expires the cache entry."""
+    return _rank_closes(fetch_history(ticker_tuple, days), top_n)
+
+
+def _rank_closes(closes: pd.DataFrame, top_n: int) -> pd.DataFrame:
+    """Rank the columns of a price frame by percentage change from first to last row."""
     if closes.empty:
-        raise ValueError("No price data returned; check tickers or network connectivity.")
+        raise EmptyDataError("No price data returned; check tickers or network connectivity.")
+
+    # Work on the raw array once instead of through per-op pandas Series, laid out
+    # as (tickers x dates) so each ticker's history is contiguous for per-ticker
+    # stats. pandas stores a single-dtype frame as that block already, so for the
+    # float32 frames from fetch_history this transpose is a view, not a copy.
+    prices = np.ascontiguousarray(closes.to_numpy(copy=False).T)
+    start = prices[:, 0]
+    end = prices[:, -1]
+    pct = (end - start) / start * 100
 
-    # Calculate percentage change from first to last available price
-    pct_change = (closes.iloc[-1] - closes.iloc[0]) / closes.iloc[0]
+    # Partial sort: select the top_n unordered, then order only those survivors.
+    # When most tickers are kept anyway, a single full sort is just as cheap.
+    k = min(top_n, pct.size)
+    if k < pct.size // 2:
+        idx = np.argpartition(-pct, k - 1)[:k]
+        idx = idx[np.argsort(-pct[idx])]
+    else:
+        idx = np.argsort(-pct)[:k]
+
+    # float32 is enough to rank all N tickers; only the k survivors are
+    # recomputed in float64 so pct_change carries no float32 rounding noise.
+    # Nothing is rounded here, callers format for display.
+    start_k = start[idx].astype(np.float64)
+    end_k = end[idx].astype(np.float64)
     summary = pd.DataFrame(
         {
-            "ticker": pct_change.index,
-            "start_price": closes.iloc[0].round(2),
-            "end_price": closes.iloc[-1].round(2),
-            "pct_change": (pct_change * 100).round(2),
+            "ticker": closes.columns.to_numpy()[idx],
+            "start_price": start_k,
+            "end_price": end_k,
+            "pct_change": (end_k - start_k) / start_k * 100,
         }
     )
-    summary = summary.sort_values("pct_change", ascending=False).head(top_n)
-    logger.info(f"Ranked top {len(summary)} performers")
-    return summary.reset_index(drop=True)
+    logger.info("Ranked top %d performers", len(summary))
+    return summary
 
 
-def merge_top_history(summary: pd.DataFrame, closes: pd.DataFrame) -> pd.DataFrame:
+def merge_top_history(
+    summary: pd.DataFrame, closes: pd.DataFrame, long_format: bool = True
+) -> pd.DataFrame:
     """Attach price trajectories to the summary for the selected tickers.
     
     This function filters the price history DataFrame to include only the tickers
     from the summary and reshapes it into a long format suitable for plotting.
+    The long columns are built directly from the underlying arrays rather than
+    through ``DataFrame.melt``. Plotting code that accepts wide data can pass
+    ``long_format=False`` to skip the reshape entirely.
 
     Args:
         summary: DataFrame with a 'ticker' column containing ticker symbols
         closes: DataFrame with dates as index and tickers as columns
+        long_format: Whether to reshape to one row per (date, ticker) (default: True)
 
     Returns:
-        DataFrame in long format with columns: Date, ticker, price
+        DataFrame in long format with columns: Date (int64 Unix seconds),
+        ticker (categorical), price, or when
+        ``long_format`` is False, the wide ``closes`` restricted to the summary's tickers
     """
     tickers = summary["ticker"].tolist()
-    filtered = closes[tickers]
-    melted = filtered.reset_index().melt(id_vars="Date", var_name="ticker", value_name="price")
-    return melted
+    if not long_format:
+        return closes[tickers]
+
+    positions = closes.columns.get_indexer(tickers)
+    if (positions < 0).any():
+        raise KeyError(f"Tickers not in price history: {[t for t, p in zip(tickers, positions) if p < 0]}")
+
+    # Gather the selected tickers straight from the (tickers x dates) view of the
+    # array: one copy, already laid out ticker-major for the long "price" column,
+    # with no intermediate column-filtered or reset_index frame
+    by_ticker = closes.to_numpy(copy=False).T[positions]
+    n_tickers, n_dates = by_ticker.shape
+    # Unix seconds: plotting code converts dates to numbers anyway, labels can use
+    # pd.to_datetime(..., unit="s") on just the ticks it draws
+    dates = closes.index.to_numpy().astype("datetime64[s]").astype(np.int64)
+    return pd.DataFrame(
+        {
+            "Date": np.tile(dates, n_tickers),
+            # Categorical codes built directly: no repeated strings and no unique() scan.
+            # The categories are an Arrow string array rather than Python objects.
+            "ticker": pd.Categorical.from_codes(
+                np.repeat(np.arange(n_tickers, dtype=np.int16), n_dates),
+                categories=pd.Index(tickers, dtype="string[pyarrow]"),
+            ),
+            "price": by_ticker.ravel(),
+        }
+    )